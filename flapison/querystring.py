@@ -13,7 +13,12 @@ from flapison.exceptions import (
     InvalidField,
     InvalidInclude,
 )
-from flapison.schema import get_model_field, get_relationships, get_schema_from_type
+from flapison.schema import (
+    get_model_field,
+    get_relationships,
+    get_schema_from_type,
+    parse_include,
+)
 
 
 class QueryStringManager(object):
@@ -33,6 +38,7 @@ class QueryStringManager(object):
 
         self.qs = querystring
         self.schema = schema
+        self._include_tree = None
 
     def _get_key_values(self, name):
         """Return a dict containing key / values items for a given key, used for items like filters, page, etc.
@@ -227,12 +233,13 @@ class QueryStringManager(object):
 
         :return list: a list of include information
         """
-        include_param = self.qs.get("include", [])
+        include_param = self.qs.get("include")
+        include = include_param.split(",") if include_param else []
 
         if current_app.config.get("MAX_INCLUDE_DEPTH") is not None:
-            for include_path in include_param:
+            for include_path in include:
                 if (
-                    len(include_path.split("."))
+                    include_path.count(".") + 1
                     > current_app.config["MAX_INCLUDE_DEPTH"]
                 ):
                     raise InvalidInclude(
@@ -241,4 +248,22 @@ class QueryStringManager(object):
                         )
                     )
 
-        return include_param.split(",") if include_param else []
+        return include
+
+    @property
+    def include_tree(self):
+        """Return fields to include as a tree of relationship fields, parsed once per
+        querystring manager
+
+        :return dict: a dict of include information
+
+        Return value will be a dict mapping each relationship field to its own included fields, for example::
+
+            {
+                "computers": {"owner": None},
+            }
+
+        """
+        if self._include_tree is None:
+            self._include_tree = parse_include(self.include)
+        return self._include_tree
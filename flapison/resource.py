@@ -27,7 +27,7 @@ from flapison.exceptions import (
 )
 from flapison.pagination import add_pagination_links
 from flapison.querystring import QueryStringManager as QSManager
-from flapison.schema import compute_schema, get_relationships, get_model_field
+from flapison.schema import compute_schema_parsed, get_relationships, get_model_field
 from flapison.content import render_json, parse_json
 from flapison.data_layers.base import BaseDataLayer
 from flapison.data_layers.alchemy import SqlalchemyDataLayer
@@ -212,7 +212,7 @@ class ResourceList(with_metaclass(ResourceMeta, Resource)):
 
         self.before_marshmallow(args, kwargs)
 
-        schema = compute_schema(self.schema, schema_kwargs, qs, qs.include)
+        schema = compute_schema_parsed(self.schema, schema_kwargs, qs, qs.include_tree)
 
         result = schema.dump(objects)
 
@@ -239,7 +239,7 @@ class ResourceList(with_metaclass(ResourceMeta, Resource)):
         json_data = self.parse_request()
 
         schema_kwargs = self._access_kwargs("post_schema_kwargs", args, kwargs)
-        schema = compute_schema(self.schema, schema_kwargs, qs, qs.include)
+        schema = compute_schema_parsed(self.schema, schema_kwargs, qs, qs.include_tree)
 
         try:
             data = schema.load(json_data)
@@ -329,7 +329,7 @@ class ResourceDetail(with_metaclass(ResourceMeta, Resource)):
         self.before_marshmallow(args, kwargs)
 
         schema_kwargs = self._access_kwargs("get_schema_kwargs", args, kwargs)
-        schema = compute_schema(self.schema, schema_kwargs, qs, qs.include)
+        schema = compute_schema_parsed(self.schema, schema_kwargs, qs, qs.include_tree)
 
         result = schema.dump(obj)
 
@@ -347,7 +347,7 @@ class ResourceDetail(with_metaclass(ResourceMeta, Resource)):
 
         self.before_marshmallow(args, kwargs)
 
-        schema = compute_schema(self.schema, schema_kwargs, qs, qs.include)
+        schema = compute_schema_parsed(self.schema, schema_kwargs, qs, qs.include_tree)
 
         try:
             data = schema.load(json_data)
@@ -470,8 +470,8 @@ class ResourceRelationship(with_metaclass(ResourceMeta, Resource)):
         }
 
         qs = QSManager(request.args, self.schema)
-        if qs.include:
-            schema = compute_schema(self.schema, dict(), qs, qs.include)
+        if qs.include_tree:
+            schema = compute_schema_parsed(self.schema, dict(), qs, qs.include_tree)
 
             serialized_obj = schema.dump(obj)
             result["included"] = serialized_obj.get("included", dict())
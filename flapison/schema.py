@@ -2,12 +2,40 @@
 
 """Helpers to deal with marshmallow schemas"""
 
+from collections import deque
+from functools import lru_cache
+from operator import attrgetter
+from weakref import WeakKeyDictionary
+
 from marshmallow import class_registry
 from marshmallow.base import SchemaABC
 from marshmallow_jsonapi.fields import Relationship, List, Nested
 
 from flapison.exceptions import InvalidInclude
 
+# schema kwargs that compute_schema layouts can be cached for
+CACHEABLE_SCHEMA_KWARGS = frozenset(
+    ("only", "exclude", "many", "load_only", "dump_only", "partial", "unknown")
+)
+# the private schema attribute of a Relationship field
+_get_rel_schema = attrgetter("_Relationship__schema")
+# declared field names, by schema class
+_declared_fields_frozenset_cache = WeakKeyDictionary()
+# relationship field names, by schema class
+_relationship_names_cache = WeakKeyDictionary()
+# schema field name -> model field name mappings, by schema class
+_schema_to_model_cache = WeakKeyDictionary()
+# model field name -> schema field name mappings, by schema class
+_model_to_schema_cache = WeakKeyDictionary()
+# nested and relationship field names, and their model field names, by schema class
+_nested_cache = WeakKeyDictionary()
+_nested_model_cache = WeakKeyDictionary()
+_relationship_cache = WeakKeyDictionary()
+_relationship_model_cache = WeakKeyDictionary()
+# schema class by resource type, and the registry size it was built from
+_type_index = {}
+_type_index_size = 0
+
 
 def compute_schema(schema_cls, default_kwargs, qs, include):
     """Compute a schema around compound documents and sparse fieldsets
@@ -19,75 +47,277 @@ def compute_schema(schema_cls, default_kwargs, qs, include):
 
     :return Schema schema: the schema computed
     """
-    # manage include_data parameter of the schema
-    schema_kwargs = default_kwargs
-    schema_kwargs["include_data"] = tuple()
+    return compute_schema_parsed(schema_cls, default_kwargs, qs, parse_include(include))
 
-    # collect sub-related_includes
-    related_includes = {}
 
-    if include:
-        for include_path in include:
-            field = include_path.split(".")[0]
+def compute_schema_parsed(schema_cls, default_kwargs, qs, include_tree):
+    """Compute a schema around compound documents and sparse fieldsets, from
+    include paths already parsed by parse_include
+
+    :param Schema schema_cls: the schema class
+    :param dict default_kwargs: the schema default kwargs
+    :param QueryStringManager qs: qs
+    :param dict include_tree: the relation fields to include data from, as a tree
+
+    :return Schema schema: the schema computed
+
+    Layouts are cached for the standard schema kwargs listed in
+    CACHEABLE_SCHEMA_KWARGS, plus context, which is never part of the cache key.
+    Any other kwarg bypasses the cache. The cache keeps references to the schema
+    classes it has seen until they are evicted or compute_schema.cache_clear() is
+    called.
+    """
+    # the context is specific to each request so it is kept out of the cache key
+    schema_kwargs = {
+        key: value for key, value in default_kwargs.items() if key != "context"
+    }
+    qs_fields_key = tuple(
+        sorted((key, tuple(value)) for key, value in qs.fields.items())
+    )
+    include_key = _flatten_include_tree(include_tree)
+
+    kwargs_key = None
+    if CACHEABLE_SCHEMA_KWARGS.issuperset(schema_kwargs):
+        try:
+            kwargs_key = frozenset(
+                (key, tuple(value) if isinstance(value, list) else value)
+                for key, value in schema_kwargs.items()
+            )
+        except TypeError:
+            pass
+
+    if kwargs_key is None:
+        # other or unhashable schema kwargs can't be cached
+        layout = _compute_layout(schema_cls, schema_kwargs, qs_fields_key, include_key)
+    else:
+        layout = _compute_schema_cached(
+            schema_cls, kwargs_key, qs_fields_key, include_key
+        )
+
+    return _build_schema(schema_cls, layout, default_kwargs.get("context"))
+
+
+def parse_include(include):
+    """Parse include paths into a tree of relationship fields
+
+    For example ``["computers.owner", "tags"]`` gives
+    ``{"computers": {"owner": None}, "tags": None}``
+
+    :param list include: the include paths
+    :return dict: the include tree
+    """
+    include_tree = {}
+    for include_path in include or ():
+        node = include_tree
+        field, sep, rest = include_path.partition(".")
+        # only allocate a sub-tree for fields that have further includes
+        while sep:
+            subtree = node.get(field)
+            if subtree is None:
+                subtree = node[field] = {}
+            node = subtree
+            field, sep, rest = rest.partition(".")
+        node.setdefault(field, None)
+
+    return include_tree
+
+
+def _flatten_include_tree(include_tree):
+    """Convert an include tree into a flat tuple so it can be used as a cache key
+
+    Nodes are numbered in breadth-first order, the root being node 0. A flat key
+    keeps hashing and comparing it free of recursion, whatever the include depth.
+
+    :param dict include_tree: the include tree
+    :return tuple: a (parent node index, field) item for each node but the root
+    """
+    flat_include = []
+    worklist = deque([(include_tree, 0)])
+    while worklist:
+        subtree, index = worklist.popleft()
+        for field, child_subtree in (subtree or {}).items():
+            flat_include.append((index, field))
+            worklist.append((child_subtree, len(flat_include)))
+
+    return tuple(flat_include)
+
+
+@lru_cache(maxsize=1024)
+def _compute_schema_cached(schema_cls, kwargs_key, qs_fields_key, include_key):
+    """Memoized version of _compute_layout
+
+    :param Schema schema_cls: the schema class
+    :param frozenset kwargs_key: the schema kwargs items
+    :param tuple qs_fields_key: the sorted sparse fieldsets items
+    :param tuple include_key: the flattened include tree
+
+    :return tuple: the layout of the schema
+    """
+    return _compute_layout(schema_cls, dict(kwargs_key), qs_fields_key, include_key)
+
+
+compute_schema.cache_clear = _compute_schema_cached.cache_clear
+compute_schema_parsed.cache_clear = _compute_schema_cached.cache_clear
+
+
+def _compute_layout(schema_cls, default_kwargs, qs_fields_key, include):
+    """Compute the schema kwargs and the related schemas around compound documents
+    and sparse fieldsets, without instantiating any schema
+
+    :param Schema schema_cls: the schema class
+    :param dict default_kwargs: the schema default kwargs, without context
+    :param tuple qs_fields_key: the sorted sparse fieldsets items
+    :param tuple include: the flattened include tree
+
+    :return tuple: the schema kwargs and a tuple of (field, related schema class,
+        related layout) for each included relationship
+    """
+    qs_fields = dict(qs_fields_key)
+
+    # (field, child node index) items of each include tree node
+    include_children = [[] for _ in range(len(include) + 1)]
+    for child, (parent, field) in enumerate(include, 1):
+        include_children[parent].append((field, child))
+
+    # (schema kwargs, [(field, related schema class, related node index)]) in
+    # breadth-first order
+    nodes = []
+    worklist = deque([(schema_cls, default_kwargs, 0, None, None)])
+    while worklist:
+        schema_cls, schema_kwargs, include_node, parent, field = worklist.popleft()
+        schema_kwargs, related = _compute_schema_kwargs(
+            schema_cls, schema_kwargs, qs_fields, include_children[include_node]
+        )
+
+        index = len(nodes)
+        nodes.append((schema_kwargs, []))
+        if parent is not None:
+            nodes[parent][1].append((field, schema_cls, index))
+
+        for related_field, related_schema_cls, related_kwargs, child in related:
+            worklist.append(
+                (related_schema_cls, related_kwargs, child, index, related_field)
+            )
+
+    # related schemas always come after their parent, so assemble from the leaves up
+    layouts = [None] * len(nodes)
+    for index in reversed(range(len(nodes))):
+        schema_kwargs, related = nodes[index]
+        layouts[index] = (
+            schema_kwargs,
+            tuple(
+                (field, related_schema_cls, layouts[child])
+                for field, related_schema_cls, child in related
+            ),
+        )
+
+    return layouts[0]
+
+
+def _compute_schema_kwargs(schema_cls, default_kwargs, qs_fields, include):
+    """Compute the kwargs of a single schema and resolve its included relationships
+
+    :param Schema schema_cls: the schema class
+    :param dict default_kwargs: the schema default kwargs, without context
+    :param dict qs_fields: the sparse fieldsets
+    :param list include: the (field, include tree node index) items to include
 
-            if field not in schema_cls._declared_fields:
+    :return tuple: the schema kwargs and a list of (field, related schema class,
+        related schema kwargs, include tree node index) for each included relationship
+    """
+    schema_kwargs = dict(default_kwargs)
+    declared = schema_cls._declared_fields
+    field_names = _get_declared_field_names(schema_cls)
+    type_ = schema_cls.Meta.type_
+
+    if include:
+        relationship_names = _get_relationship_names(schema_cls)
+        for field, _ in include:
+            if field not in field_names:
                 raise InvalidInclude(
                     "{} has no attribute {}".format(schema_cls.__name__, field)
                 )
-            elif not isinstance(schema_cls._declared_fields[field], Relationship):
+            elif field not in relationship_names:
                 raise InvalidInclude(
                     "{} is not a relationship attribute of {}".format(
                         field, schema_cls.__name__
                     )
                 )
 
-            schema_kwargs["include_data"] += (field,)
-            if field not in related_includes:
-                related_includes[field] = []
-            if "." in include_path:
-                related_includes[field] += [".".join(include_path.split(".")[1:])]
+    # manage include_data parameter of the schema
+    schema_kwargs["include_data"] = tuple(field for field, _ in include)
 
     # manage sparse fieldsets
-    if schema_cls.Meta.type_ in qs.fields:
-        tmp_only = set(schema_cls._declared_fields.keys()) & set(
-            qs.fields[schema_cls.Meta.type_]
-        )
-        if schema_kwargs.get("only") is not None:
-            tmp_only &= set(schema_kwargs["only"])
-        schema_kwargs["only"] = tuple(tmp_only)
+    # only_set is used for membership tests while only keeps the requested order,
+    # since ordered schemas build their output fields in the order of only
+    only = schema_kwargs.get("only")
+    if type_ in qs_fields:
+        only_set = set(qs_fields[type_])
+        only_set.intersection_update(field_names)
+        if only is not None:
+            only_set.intersection_update(only)
+        only = [field for field in qs_fields[type_] if field in only_set]
+    elif only is not None:
+        only = list(only)
+        only_set = set(only)
 
     # make sure id field is in only parameter unless marshamllow will raise an Exception
-    if schema_kwargs.get("only") is not None and "id" not in schema_kwargs["only"]:
-        schema_kwargs["only"] += ("id",)
-
-    # create base schema instance
-    schema = schema_cls(**schema_kwargs)
+    if only is not None:
+        if "id" not in only_set:
+            only.append("id")
+        schema_kwargs["only"] = tuple(only)
 
     # manage compound documents
-    if include:
-        for include_path in include:
-            field = include_path.split(".")[0]
-            relation_field = schema.declared_fields[field]
-            related_schema_cls = schema.declared_fields[field].__dict__[
-                "_Relationship__schema"
-            ]
-            related_schema_kwargs = {}
-            if "context" in default_kwargs:
-                related_schema_kwargs["context"] = default_kwargs["context"]
-            if isinstance(related_schema_cls, SchemaABC):
-                related_schema_kwargs["many"] = related_schema_cls.many
-                related_schema_cls = related_schema_cls.__class__
-            if isinstance(related_schema_cls, str):
-                related_schema_cls = class_registry.get_class(related_schema_cls)
-            related_schema = compute_schema(
-                related_schema_cls,
-                related_schema_kwargs,
-                qs,
-                related_includes[field] or None,
+    related = []
+    for field, child in include:
+        related_schema_cls = _get_rel_schema(declared[field])
+        related_schema_kwargs = {}
+        if isinstance(related_schema_cls, SchemaABC):
+            related_schema_kwargs["many"] = related_schema_cls.many
+            related_schema_cls = related_schema_cls.__class__
+        if isinstance(related_schema_cls, str):
+            related_schema_cls = class_registry.get_class(related_schema_cls)
+        related.append((field, related_schema_cls, related_schema_kwargs, child))
+
+    return schema_kwargs, related
+
+
+def _build_schema(schema_cls, layout, context):
+    """Instantiate a schema and its related schemas from a computed layout
+
+    :param Schema schema_cls: the schema class
+    :param tuple layout: the layout computed by _compute_layout
+    :param dict context: the context to give to every schema, if any
+
+    :return Schema schema: the schema computed
+    """
+    schemas = []
+    # (parent schema declared fields, relationship field, related schema index)
+    links = []
+
+    worklist = deque([(schema_cls, layout, None, None)])
+    while worklist:
+        schema_cls, (schema_kwargs, related_layouts), parent, field = worklist.popleft()
+        if context is not None:
+            schema_kwargs = dict(schema_kwargs, context=context)
+
+        index = len(schemas)
+        schema = schema_cls(**schema_kwargs)
+        schemas.append(schema)
+        if parent is not None:
+            links.append((parent, field, index))
+
+        declared = schema.declared_fields
+        for related_field, related_schema_cls, related_layout in related_layouts:
+            worklist.append(
+                (related_schema_cls, related_layout, declared, related_field)
             )
-            relation_field.__dict__["_Relationship__schema"] = related_schema
 
-    return schema
+    # manage compound documents
+    for declared, field, child in reversed(links):
+        declared[field]._Relationship__schema = schemas[child]
+
+    return schemas[0]
 
 
 def get_model_field(schema, field):
@@ -97,12 +327,12 @@ def get_model_field(schema, field):
     :param str field: the name of the schema field
     :return str: the name of the field in the model
     """
-    if schema._declared_fields.get(field) is None:
-        raise Exception("{} has no attribute {}".format(schema.__name__, field))
-
-    if schema._declared_fields[field].attribute is not None:
-        return schema._declared_fields[field].attribute
-    return field
+    try:
+        return _get_schema_to_model(schema)[field]
+    except KeyError:
+        raise Exception(
+            "{} has no attribute {}".format(_get_schema_cls(schema).__name__, field)
+        )
 
 
 def get_nested_fields(schema, model_field=False):
@@ -110,18 +340,24 @@ def get_nested_fields(schema, model_field=False):
 
     :param Schema schema: a marshmallow schema
     :param boolean model_field: whether to extract the model field for the nested fields
-    :return list: list of nested fields of the schema
+    :return tuple: tuple of nested fields of the schema
     """
-
-    nested_fields = []
-    for (key, value) in schema._declared_fields.items():
-        if isinstance(value, List) and isinstance(value.inner, Nested):
-            nested_fields.append(key)
-        elif isinstance(value, Nested):
-            nested_fields.append(key)
+    schema_cls = _get_schema_cls(schema)
+    nested_fields = _nested_cache.get(schema_cls)
+    if nested_fields is None:
+        nested_fields = tuple(
+            key
+            for (key, value) in schema_cls._declared_fields.items()
+            if (isinstance(value, List) and isinstance(value.inner, Nested))
+            or isinstance(value, Nested)
+        )
+        _nested_model_cache[schema_cls] = tuple(
+            get_model_field(schema_cls, key) for key in nested_fields
+        )
+        _nested_cache[schema_cls] = nested_fields
 
     if model_field is True:
-        nested_fields = [get_model_field(schema, key) for key in nested_fields]
+        return _nested_model_cache[schema_cls]
 
     return nested_fields
 
@@ -130,16 +366,23 @@ def get_relationships(schema, model_field=False):
     """Return relationship fields of a schema
 
     :param Schema schema: a marshmallow schema
-    :param list: list of relationship fields of a schema
+    :param tuple: tuple of relationship fields of a schema
     """
-    relationships = [
-        key
-        for (key, value) in schema._declared_fields.items()
-        if isinstance(value, Relationship)
-    ]
+    schema_cls = _get_schema_cls(schema)
+    relationships = _relationship_cache.get(schema_cls)
+    if relationships is None:
+        relationships = tuple(
+            key
+            for (key, value) in schema_cls._declared_fields.items()
+            if isinstance(value, Relationship)
+        )
+        _relationship_model_cache[schema_cls] = tuple(
+            get_model_field(schema_cls, key) for key in relationships
+        )
+        _relationship_cache[schema_cls] = relationships
 
     if model_field is True:
-        relationships = [get_model_field(schema, key) for key in relationships]
+        return _relationship_model_cache[schema_cls]
 
     return relationships
 
@@ -151,7 +394,7 @@ def get_related_schema(schema, field):
     :param field: the relationship field
     :return Schema: the related schema
     """
-    return schema._declared_fields[field].__dict__["_Relationship__schema"]
+    return _get_rel_schema(schema._declared_fields[field])
 
 
 def get_schema_from_type(resource_type):
@@ -160,14 +403,35 @@ def get_schema_from_type(resource_type):
     :param str type_: the type of the resource
     :return Schema: the schema class
     """
-    for cls_name, cls in class_registry._registry.items():
-        try:
-            if cls[0].opts.type_ == resource_type:
-                return cls[0]
-        except Exception:
-            pass
+    # rebuild the index whenever schemas have been registered since the last lookup
+    if len(class_registry._registry) != _type_index_size:
+        _rebuild_type_index()
+
+    try:
+        return _type_index[resource_type]
+    except KeyError:
+        pass
 
-    raise Exception("Couldn't find schema for type: {}".format(resource_type))
+    # a schema redefined in the same module replaces its registry entry without
+    # changing the registry size, so rebuild once more before giving up
+    _rebuild_type_index()
+    try:
+        return _type_index[resource_type]
+    except KeyError:
+        raise Exception("Couldn't find schema for type: {}".format(resource_type))
+
+
+def _rebuild_type_index():
+    """Index the schemas of the marshmallow class registry by resource type"""
+    global _type_index, _type_index_size
+
+    type_index = {}
+    for cls_name, cls in class_registry._registry.items():
+        opts = getattr(cls[0], "opts", None)
+        type_ = getattr(opts, "type_", None)
+        if type_ is not None:
+            type_index.setdefault(type_, cls[0])
+    _type_index, _type_index_size = type_index, len(class_registry._registry)
 
 
 def get_schema_field(schema, field):
@@ -177,12 +441,72 @@ def get_schema_field(schema, field):
     :param str field: the name of the model field
     :return str: the name of the field in the schema
     """
-    schema_fields_to_model = {
-        key: get_model_field(schema, key)
-        for (key, value) in schema._declared_fields.items()
-    }
-    for key, value in schema_fields_to_model.items():
-        if value == field:
-            return key
+    schema_cls = _get_schema_cls(schema)
+    model_to_schema = _model_to_schema_cache.get(schema_cls)
+    if model_to_schema is None:
+        model_to_schema = {}
+        for key, value in _get_schema_to_model(schema_cls).items():
+            model_to_schema.setdefault(value, key)
+        _model_to_schema_cache[schema_cls] = model_to_schema
+
+    try:
+        return model_to_schema[field]
+    except KeyError:
+        raise Exception("Couldn't find schema field from {}".format(field))
+
+
+def _get_schema_cls(schema):
+    """Return the class of a schema given as a class or as an instance
+
+    :param Schema schema: a marshmallow schema class or instance
+    :return type: the schema class
+    """
+    return schema if isinstance(schema, type) else type(schema)
+
 
-    raise Exception("Couldn't find schema field from {}".format(field))
+def _get_declared_field_names(schema):
+    """Return the names of the declared fields of a schema, computed once per
+    schema class
+
+    :param Schema schema: a marshmallow schema
+    :return frozenset: the declared field names
+    """
+    schema_cls = _get_schema_cls(schema)
+    field_names = _declared_fields_frozenset_cache.get(schema_cls)
+    if field_names is None:
+        field_names = frozenset(schema_cls._declared_fields)
+        _declared_fields_frozenset_cache[schema_cls] = field_names
+    return field_names
+
+
+def _get_relationship_names(schema):
+    """Return the names of the relationship fields of a schema, computed once per
+    schema class
+
+    :param Schema schema: a marshmallow schema
+    :return frozenset: the relationship field names
+    """
+    schema_cls = _get_schema_cls(schema)
+    relationship_names = _relationship_names_cache.get(schema_cls)
+    if relationship_names is None:
+        relationship_names = frozenset(get_relationships(schema_cls))
+        _relationship_names_cache[schema_cls] = relationship_names
+    return relationship_names
+
+
+def _get_schema_to_model(schema):
+    """Return the model field name of each field of a schema, computed once per
+    schema class since declared fields never change after the class is created
+
+    :param Schema schema: a marshmallow schema
+    :return dict: the model field names by schema field name
+    """
+    schema_cls = _get_schema_cls(schema)
+    schema_to_model = _schema_to_model_cache.get(schema_cls)
+    if schema_to_model is None:
+        schema_to_model = {
+            key: key if value.attribute is None else value.attribute
+            for (key, value) in schema_cls._declared_fields.items()
+        }
+        _schema_to_model_cache[schema_cls] = schema_to_model
+    return schema_to_model
@@ -105,6 +105,18 @@ def test_query_string_manager(person_schema):
         qsm.sorting
 
 
+def test_query_string_manager_include_depth(app, person_schema):
+    app.config["MAX_INCLUDE_DEPTH"] = 2
+    with app.app_context():
+        qsm = QSManager({"include": "computers,computers.owner"}, person_schema)
+        assert qsm.include == ["computers", "computers.owner"]
+        qsm = QSManager(
+            {"include": "computers,computers.owner.computers"}, person_schema
+        )
+        with pytest.raises(InvalidInclude):
+            qsm.include
+
+
 @pytest.mark.skip(
     "Monkey patching the request class stops the header parsing and breaks content negotiation"
 )
@@ -165,6 +177,210 @@ def test_compute_schema_propagate_context(person_schema, computer_schema):
     ].__dict__["context"] == dict(foo="bar")
 
 
+def test_compute_schema_cache(person_schema, computer_schema):
+    query_string = {"fields[person]": "name,computers"}
+    qsm = QSManager(query_string, person_schema)
+    flapison.schema.compute_schema.cache_clear()
+    schema = flapison.schema.compute_schema(
+        person_schema, dict(context=dict(foo="bar")), qsm, ["computers"]
+    )
+    other_schema = flapison.schema.compute_schema(
+        person_schema, dict(context=dict(foo="baz")), qsm, ["computers"]
+    )
+    assert flapison.schema._compute_schema_cached.cache_info().hits > 0
+    assert schema is not other_schema
+    assert set(other_schema.only) == {"id", "name", "computers"}
+    assert other_schema.include_data == ("computers",)
+    related_schema = other_schema.declared_fields["computers"].__dict__[
+        "_Relationship__schema"
+    ]
+    assert related_schema.Meta.type_ == "computer"
+    assert related_schema.context == dict(foo="baz")
+
+
+def test_compute_schema_cache_nested_include(person_schema, computer_schema):
+    qsm = QSManager({"fields[computer]": "serial,owner"}, person_schema)
+    flapison.schema.compute_schema.cache_clear()
+    flapison.schema.compute_schema(
+        person_schema, dict(), qsm, ["computers.owner.computers", "computers"]
+    )
+    schema = flapison.schema.compute_schema(
+        person_schema, dict(), qsm, ["computers", "computers.owner.computers"]
+    )
+    assert flapison.schema._compute_schema_cached.cache_info().hits == 1
+    assert schema.include_data == ("computers",)
+    computers_schema = schema.declared_fields["computers"].__dict__[
+        "_Relationship__schema"
+    ]
+    assert computers_schema.include_data == ("owner",)
+    assert set(computers_schema.only) == {"id", "serial", "owner"}
+    owner_schema = computers_schema.declared_fields["owner"].__dict__[
+        "_Relationship__schema"
+    ]
+    assert owner_schema.include_data == ("computers",)
+    assert owner_schema.Meta.type_ == "person"
+
+
+def test_compute_schema_cache_bypass(person_schema):
+    class ExtraKwargSchema(Schema):
+        class Meta:
+            type_ = "extra_kwarg"
+
+        id = fields.Str()
+
+        def __init__(self, *args, extra=None, **kwargs):
+            self.extra = extra
+            super().__init__(*args, **kwargs)
+
+    qsm = QSManager({}, person_schema)
+    flapison.schema.compute_schema.cache_clear()
+    schema = flapison.schema.compute_schema(
+        ExtraKwargSchema, dict(extra=object(), many=True), qsm, []
+    )
+    assert schema.many is True
+    assert flapison.schema._compute_schema_cached.cache_info().currsize == 0
+
+
+def test_compute_schema_ordered_only(person_schema):
+    class OrderedSchema(Schema):
+        class Meta:
+            type_ = "ordered"
+            ordered = True
+
+        id = fields.Str()
+        a = fields.Str()
+        b = fields.Str()
+        c = fields.Str()
+        d = fields.Str()
+
+    qsm = QSManager({}, person_schema)
+    schema = flapison.schema.compute_schema(
+        OrderedSchema, dict(only=("d", "c", "b", "a")), qsm, []
+    )
+    assert list(schema.fields) == ["d", "c", "b", "a", "id"]
+
+    qsm = QSManager({"fields[ordered]": "c,id,a"}, person_schema)
+    schema = flapison.schema.compute_schema(
+        OrderedSchema, dict(only=["a", "b", "c"]), qsm, []
+    )
+    assert list(schema.fields) == ["c", "a", "id"]
+
+
+def test_compute_schema_duplicate_include(person_schema, computer_schema):
+    qsm = QSManager({}, person_schema)
+    schema = flapison.schema.compute_schema(
+        person_schema, dict(), qsm, ["computers", "computers.owner"]
+    )
+    assert schema.include_data == ("computers",)
+    related_schema = schema.declared_fields["computers"].__dict__[
+        "_Relationship__schema"
+    ]
+    assert related_schema.include_data == ("owner",)
+
+
+def test_compute_schema_deep_include(person_schema, computer_schema):
+    qsm = QSManager({}, person_schema)
+    include_path = ".".join(["computers", "owner"] * 600)
+    flapison.schema.compute_schema.cache_clear()
+    for hits in (0, 1):
+        schema = flapison.schema.compute_schema(
+            person_schema, dict(), qsm, [include_path]
+        )
+        assert flapison.schema._compute_schema_cached.cache_info().hits == hits
+        depth = 0
+        while schema.include_data:
+            (field,) = schema.include_data
+            schema = schema.declared_fields[field].__dict__["_Relationship__schema"]
+            depth += 1
+        assert depth == 1200
+
+
+def test_parse_include():
+    assert flapison.schema.parse_include(None) == {}
+    assert flapison.schema.parse_include(
+        ["computers", "computers.owner.computers", "tags"]
+    ) == {"computers": {"owner": {"computers": None}}, "tags": None}
+    assert flapison.schema.parse_include(["computers.owner", "computers"]) == {
+        "computers": {"owner": None}
+    }
+
+
+def test_query_string_manager_include_tree(app, person_schema):
+    with app.app_context():
+        qsm = QSManager({"include": "computers.owner,computers"}, person_schema)
+        include_tree = qsm.include_tree
+        assert include_tree == {"computers": {"owner": None}}
+        assert qsm.include_tree is include_tree
+
+
+def test_compute_schema_parsed(person_schema, computer_schema):
+    qsm = QSManager({}, person_schema)
+    schema = flapison.schema.compute_schema_parsed(
+        person_schema, dict(), qsm, {"computers": {"owner": None}}
+    )
+    assert schema.include_data == ("computers",)
+    related_schema = schema.declared_fields["computers"].__dict__[
+        "_Relationship__schema"
+    ]
+    assert related_schema.include_data == ("owner",)
+    with pytest.raises(InvalidInclude):
+        flapison.schema.compute_schema_parsed(
+            person_schema, dict(), qsm, {"computers": {"serial": None}}
+        )
+
+
+def test_schema_model_fields(person_schema, computer_schema):
+    assert flapison.schema.get_model_field(person_schema, "id") == "person_id"
+    assert flapison.schema.get_model_field(computer_schema(), "owner") == "person"
+    assert flapison.schema.get_schema_field(person_schema, "person_id") == "id"
+    assert flapison.schema.get_schema_field(computer_schema, "person") == "owner"
+    with pytest.raises(Exception):
+        flapison.schema.get_model_field(person_schema, "person_id")
+    with pytest.raises(Exception):
+        flapison.schema.get_schema_field(person_schema, "id")
+
+
+def test_get_schema_from_type_redefined_schema():
+    def make_schema(type_name):
+        class RedefinedSchema(Schema):
+            class Meta:
+                type_ = type_name
+
+            id = fields.Str()
+
+        return RedefinedSchema
+
+    first_schema = make_schema("redefined_a")
+    assert flapison.schema.get_schema_from_type("redefined_a") is first_schema
+    second_schema = make_schema("redefined_b")
+    assert flapison.schema.get_schema_from_type("redefined_b") is second_schema
+    with pytest.raises(Exception):
+        flapison.schema.get_schema_from_type("redefined_c")
+
+
+def test_get_schema_field_first_match():
+    class AliasSchema(Schema):
+        class Meta:
+            type_ = "alias"
+
+        id = fields.Str()
+        name = fields.Str(attribute="label")
+        title = fields.Str(attribute="label")
+
+    assert flapison.schema.get_schema_field(AliasSchema, "label") == "name"
+    assert flapison.schema.get_schema_field(AliasSchema, "id") == "id"
+
+
+def test_schema_relationships_and_nested_fields(person_schema, computer_schema):
+    assert flapison.schema.get_relationships(person_schema) == ("computers",)
+    assert flapison.schema.get_relationships(computer_schema) == ("owner",)
+    assert flapison.schema.get_relationships(computer_schema, model_field=True) == (
+        "person",
+    )
+    assert flapison.schema.get_nested_fields(person_schema()) == ("tags", "single_tag")
+    assert flapison.schema.get_nested_fields(computer_schema, model_field=True) == ()
+
+
 # test good cases
 def test_get_list(client, registered_routes, person, person_2):
     with client: